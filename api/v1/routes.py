@@ -1,40 +1,58 @@
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Namespace, Resource, fields, reqparse, inputs
 from flask import request, current_app
+from extensions import cache, limiter
+from werkzeug.exceptions import HTTPException
+from sqlalchemy import delete, insert
 from models import Book, db
-from schemas import BookSchema
+from marshmallow import ValidationError as SchemaValidationError
+from schemas import book_schema, books_schema, fast_dump
 from errors import ValidationError
+import json_provider
+from caching import invalidate_many, bump_books_version, books_cache_key, cached_book_body
 import logging
+from datetime import date
+
+logger = logging.getLogger('book_manager')
 
 # Initialize API namespace
 api = Namespace('v1', description='API v1 endpoints')
 
-# Initialize schemas
-book_schema = BookSchema()
-books_schema = BookSchema(many=True)
-
 # Request parsers
+SORT_FIELDS = ('title', 'author', 'published_date')
+SORT_ORDERS = ('asc', 'desc')
+MAX_PER_PAGE = 100
+
+# Only used to document the list endpoint; BookList.get reads request.args
+# directly because parse_args is comparatively slow on a cache-hit path
 pagination_parser = reqparse.RequestParser()
-pagination_parser.add_argument('page', type=int, default=1, help='Page number')
-pagination_parser.add_argument('per_page', type=int, default=10, help='Items per page')
-pagination_parser.add_argument('sort', type=str, choices=('title', 'author', 'published_date'), help='Sort field')
-pagination_parser.add_argument('order', type=str, choices=('asc', 'desc'), default='asc', help='Sort order')
+pagination_parser.add_argument('per_page', type=int, default=10, help=f'Items per page (at most {MAX_PER_PAGE})')
+pagination_parser.add_argument('cursor', type=str, help='Sort value of the last item on the previous page')
+pagination_parser.add_argument('cursor_id', type=int, help='ID of the last item on the previous page')
+pagination_parser.add_argument('sort', type=str, choices=SORT_FIELDS, help='Sort field')
+pagination_parser.add_argument('order', type=str, choices=SORT_ORDERS, default='asc', help='Sort order')
 pagination_parser.add_argument('q', type=str, help='Search query')
+pagination_parser.add_argument('fields', type=str, help='Comma-separated extra fields to include (summary)')
+pagination_parser.add_argument('exact_count', type=inputs.boolean, default=False, help='Return an exact total_items instead of an estimate')
 
 # API Models
 book_model = api.model('Book', {
     'title': fields.String(required=True, description='Book title'),
     'author': fields.String(required=True, description='Book author'),
-    'published_date': fields.String(description='Publication date (YYYY-MM-DD)'),
+    'published_date': fields.Date(description='Publication date (YYYY-MM-DD)'),
     'summary': fields.String(description='Book summary')
 })
 
+cursor_model = api.model('Cursor', {
+    'cursor': fields.String(description='Sort value of the last item'),
+    'cursor_id': fields.Integer(description='ID of the last item')
+})
+
 pagination_response = api.model('PaginatedResponse', {
     'status': fields.String(description='Response status'),
     'data': fields.List(fields.Nested(book_model)),
-    'page': fields.Integer(description='Current page number'),
     'per_page': fields.Integer(description='Items per page'),
-    'total_pages': fields.Integer(description='Total number of pages'),
-    'total_items': fields.Integer(description='Total number of items')
+    'next_cursor': fields.Nested(cursor_model, allow_null=True, description='Cursor for the next page, null on the last page'),
+    'total_items': fields.Integer(description='Estimated number of matching items, exact when exact_count is set')
 })
 
 bulk_books_model = api.model('BulkBooks', {
@@ -47,60 +65,89 @@ class BookList(Resource):
     @api.doc('list_books')
     @api.expect(pagination_parser)
     @api.response(200, 'Success', pagination_response)
-    @current_app.cache.cached(timeout=300, query_string=True)
+    @limiter.limit("100/hour")
+    @cache.cached(timeout=300, make_cache_key=lambda *args, **kwargs: books_cache_key(cache))
     def get(self):
         """List all books with pagination and search"""
         try:
-            logging.info("Fetching books with pagination")
-            args = pagination_parser.parse_args()
-            page = args['page']
-            per_page = args['per_page']
-            sort_field = args['sort']
-            order = args['order']
-            search_query = args['q']
+            logger.info("Fetching books with pagination")
+            args = request.args
+            per_page = min(max(int(args.get('per_page', 10)), 1), MAX_PER_PAGE)
+            sort_field = args.get('sort')
+            if sort_field is not None and sort_field not in SORT_FIELDS:
+                raise ValueError(f"Invalid sort field: {sort_field}")
+            order = args.get('order', 'asc')
+            if order not in SORT_ORDERS:
+                raise ValueError(f"Invalid sort order: {order}")
+            search_query = args.get('q')
+            cursor = args.get('cursor')
+            if cursor is not None and sort_field == 'published_date':
+                cursor = date.fromisoformat(cursor)
+            cursor_id = int(args['cursor_id']) if 'cursor_id' in args else None
+            exact_count = inputs.boolean(args.get('exact_count', False))
 
             query = Book.query
 
             if search_query:
                 query = Book.search(search_query)
 
-            if sort_field:
-                sort_column = getattr(Book, sort_field)
-                if order == 'desc':
-                    sort_column = sort_column.desc()
-                query = query.order_by(sort_column)
+            # Leave the heavy summary column out of lists unless requested
+            extra_fields = set(args['fields'].split(',')) if args.get('fields') else set()
+            unknown_fields = extra_fields - {'summary'}
+            if unknown_fields:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown_fields))}")
+            include_summary = 'summary' in extra_fields
+            columns = [Book.id, Book.title, Book.author, Book.published_date]
+            if include_summary:
+                columns.append(Book.summary)
 
-            pagination = query.paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
-            )
+            # Estimate the total from planner statistics unless asked for COUNT(*)
+            if exact_count:
+                total_items = query.order_by(None).count()
+            else:
+                total_items = Book.approx_count(query)
+
+            query = Book.seek(query, sort_field, order, cursor, cursor_id)
+            # Fetch plain rows rather than Book instances so a page skips
+            # identity-map and attribute instrumentation entirely
+            books = db.session.execute(query.with_entities(*columns).limit(per_page + 1).statement).all()
+
+            next_cursor = None
+            if len(books) > per_page:
+                books = books[:per_page]
+                last = books[-1]
+                cursor_value = getattr(last, sort_field) if sort_field else None
+                next_cursor = {
+                    "cursor": cursor_value.isoformat() if isinstance(cursor_value, date) else cursor_value,
+                    "cursor_id": last.id
+                }
 
             return {
                 "status": "success",
-                "data": books_schema.dump(pagination.items),
-                "page": page,
+                "data": [fast_dump(book, include_summary) for book in books],
                 "per_page": per_page,
-                "total_pages": pagination.pages,
-                "total_items": pagination.total,
+                "next_cursor": next_cursor,
+                "total_items": total_items,
                 "search_query": search_query if search_query else None
             }, 200
         except Exception as e:
-            logging.error(f"Error fetching books: {str(e)}")
+            logger.error("Error fetching books: %s", e)
             raise ValidationError(str(e))
 
     @api.doc('create_book')
     @api.expect(book_model)
+    @limiter.limit("20/hour")
     def post(self):
         """Create a new book"""
         try:
             data = request.get_json()
-            logging.info(f"Creating new book with data: {data}")
+            logger.info("Creating new book with data: %s", data)
             
-            errors = book_schema.validate(data)
-            if errors:
-                logging.warning(f"Validation error in book creation: {errors}")
-                raise ValidationError(str(errors))
+            try:
+                data = book_schema.load(data)
+            except SchemaValidationError as e:
+                logger.warning("Validation error in book creation: %s", e.messages)
+                raise ValidationError(str(e.messages))
                 
             new_book = Book(
                 title=data['title'],
@@ -112,16 +159,16 @@ class BookList(Resource):
             db.session.commit()
 
             # Invalidate cache
-            current_app.cache.delete('books')
+            bump_books_version(cache)
             
-            logging.info(f"Successfully created book with ID: {new_book.id}")
+            logger.info("Successfully created book with ID: %s", new_book.id)
             return {
                 "status": "success",
                 "message": "Book created successfully",
-                "data": book_schema.dump(new_book)
+                "data": fast_dump(new_book)
             }, 201
         except Exception as e:
-            logging.error(f"Error creating book: {str(e)}")
+            logger.error("Error creating book: %s", e)
             db.session.rollback()
             raise ValidationError(str(e))
 
@@ -130,33 +177,42 @@ class BookList(Resource):
 class BookResource(Resource):
     @api.doc('get_book')
     @api.response(200, 'Success', book_model)
-    @current_app.cache.cached(timeout=300, key_prefix='book')
     def get(self, book_id):
         """Get a book by ID"""
         try:
-            logging.info(f"Fetching book with ID: {book_id}")
-            book = Book.query.get_or_404(book_id)
-            return {
-                "status": "success",
-                "data": book_schema.dump(book)
-            }, 200
+            logger.info("Fetching book with ID: %s", book_id)
+
+            def render():
+                book = Book.query.options(*Book.DEFAULT_LOAD_OPTIONS).get_or_404(book_id)
+                return json_provider.dumps({
+                    "status": "success",
+                    "data": fast_dump(book)
+                })
+
+            # Serve the pre-serialized body straight from the cache layers
+            body = cached_book_body(cache, book_id, render)
+            return current_app.response_class(body, mimetype='application/json')
+        except HTTPException:
+            raise
         except Exception as e:
-            logging.error(f"Error fetching book: {str(e)}")
+            logger.error("Error fetching book: %s", e)
             raise ValidationError(str(e))
 
     @api.doc('update_book')
     @api.expect(book_model)
+    @limiter.limit("20/hour")
     def put(self, book_id):
         """Update a book"""
         try:
-            logging.info(f"Updating book with ID: {book_id}")
+            logger.info("Updating book with ID: %s", book_id)
             book = Book.query.get_or_404(book_id)
             data = request.get_json()
             
-            errors = book_schema.validate(data)
-            if errors:
-                logging.warning(f"Validation error in book update: {errors}")
-                raise ValidationError(str(errors))
+            try:
+                data = book_schema.load(data)
+            except SchemaValidationError as e:
+                logger.warning("Validation error in book update: %s", e.messages)
+                raise ValidationError(str(e.messages))
                 
             book.title = data.get('title', book.title)
             book.author = data.get('author', book.author)
@@ -166,40 +222,45 @@ class BookResource(Resource):
             db.session.commit()
 
             # Invalidate cache
-            current_app.cache.delete(f'book{book_id}')
-            current_app.cache.delete('books')
+            cache.delete(f'book{book_id}')
+            bump_books_version(cache)
 
-            logging.info(f"Successfully updated book with ID: {book_id}")
+            logger.info("Successfully updated book with ID: %s", book_id)
             return {
                 "status": "success",
                 "message": "Book updated successfully",
-                "data": book_schema.dump(book)
+                "data": fast_dump(book)
             }, 200
+        except HTTPException:
+            raise
         except Exception as e:
-            logging.error(f"Error updating book: {str(e)}")
+            logger.error("Error updating book: %s", e)
             db.session.rollback()
             raise ValidationError(str(e))
 
     @api.doc('delete_book')
+    @limiter.limit("20/hour")
     def delete(self, book_id):
         """Delete a book"""
         try:
-            logging.info(f"Deleting book with ID: {book_id}")
+            logger.info("Deleting book with ID: %s", book_id)
             book = Book.query.get_or_404(book_id)
             db.session.delete(book)
             db.session.commit()
 
             # Invalidate cache
-            current_app.cache.delete(f'book{book_id}')
-            current_app.cache.delete('books')
+            cache.delete(f'book{book_id}')
+            bump_books_version(cache)
 
-            logging.info(f"Successfully deleted book with ID: {book_id}")
+            logger.info("Successfully deleted book with ID: %s", book_id)
             return {
                 "status": "success",
                 "message": "Book deleted successfully"
             }, 200
+        except HTTPException:
+            raise
         except Exception as e:
-            logging.error(f"Error deleting book: {str(e)}")
+            logger.error("Error deleting book: %s", e)
             db.session.rollback()
             raise ValidationError(str(e))
 
@@ -207,59 +268,52 @@ class BookResource(Resource):
 class BulkBookOperations(Resource):
     @api.doc('bulk_create_books')
     @api.expect(bulk_books_model)
+    @limiter.limit("10/hour")
     def post(self):
         """Create multiple books in a single request"""
         try:
             data = request.get_json()
-            logging.info(f"Creating {len(data['books'])} books in bulk")
+            logger.info("Creating %s books in bulk", len(data['books']))
             
             books_data = data['books']
-            errors = []
-            new_books = []
-            
-            for idx, book_data in enumerate(books_data):
-                book_errors = book_schema.validate(book_data)
-                if book_errors:
-                    errors.append({
-                        'index': idx,
-                        'errors': book_errors
-                    })
-                else:
-                    new_book = Book(
-                        title=book_data['title'],
-                        author=book_data['author'],
-                        published_date=book_data.get('published_date'),
-                        summary=book_data.get('summary')
-                    )
-                    new_books.append(new_book)
-            
-            if errors:
-                logging.warning(f"Validation errors in bulk creation: {errors}")
+            # Validate the whole payload in one pass of the many=True schema
+            try:
+                loaded = books_schema.load(books_data)
+            except SchemaValidationError as e:
+                errors = [
+                    {'index': idx, 'errors': book_errors}
+                    for idx, book_errors in e.messages.items()
+                ]
+                logger.warning("Validation errors in bulk creation: %s", errors)
                 return {
                     "status": "error",
                     "message": "Validation errors occurred",
                     "errors": errors
                 }, 400
-                
-            db.session.bulk_save_objects(new_books)
+
+            rows = [{'published_date': None, 'summary': None, **book_data} for book_data in loaded]
+
+            # One multi-row INSERT ... RETURNING gives back the created books with their IDs
+            new_books = db.session.scalars(insert(Book).returning(Book, sort_by_parameter_order=True), rows).all() if rows else []
             db.session.commit()
 
             # Invalidate cache
-            current_app.cache.delete('books')
+            bump_books_version(cache)
             
-            logging.info(f"Successfully created {len(new_books)} books in bulk")
+            logger.info("Successfully created %s books in bulk", len(new_books))
             return {
                 "status": "success",
                 "message": f"Successfully created {len(new_books)} books",
-                "data": books_schema.dump(new_books)
+                "data": [fast_dump(book) for book in new_books]
             }, 201
             
         except Exception as e:
-            logging.error(f"Error in bulk book creation: {str(e)}")
+            logger.error("Error in bulk book creation: %s", e)
             db.session.rollback()
             raise ValidationError(str(e))
 
     @api.doc('bulk_delete_books')
+    @limiter.limit("10/hour")
     def delete(self):
         """Delete multiple books in a single request"""
         try:
@@ -269,23 +323,23 @@ class BulkBookOperations(Resource):
             if not book_ids:
                 raise ValidationError("No book IDs provided")
                 
-            logging.info(f"Deleting books with IDs: {book_ids}")
+            logger.info("Deleting books with IDs: %s", book_ids)
             
-            deleted_count = Book.query.filter(Book.id.in_(book_ids)).delete(synchronize_session=False)
+            result = db.session.execute(delete(Book).where(Book.id_matches(book_ids)))
+            deleted_count = result.rowcount
             db.session.commit()
 
             # Invalidate cache
-            current_app.cache.delete('books')
-            for book_id in book_ids:
-                current_app.cache.delete(f'book{book_id}')
+            invalidate_many(cache, [f'book{book_id}' for book_id in book_ids])
+            bump_books_version(cache)
             
-            logging.info(f"Successfully deleted {deleted_count} books")
+            logger.info("Successfully deleted %s books", deleted_count)
             return {
                 "status": "success",
                 "message": f"Successfully deleted {deleted_count} books"
             }, 200
             
         except Exception as e:
-            logging.error(f"Error in bulk book deletion: {str(e)}")
+            logger.error("Error in bulk book deletion: %s", e)
             db.session.rollback()
-            raise ValidationError(str(e))
\ No newline at end of file
+            raise ValidationError(str(e))
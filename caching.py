@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from urllib.parse import urlencode
+from cachetools import TTLCache
+from flask import g, request
+
+logger = logging.getLogger('book_manager')
+
+# Every cached book list is keyed on this version, so bumping it
+# invalidates all sorted/paginated/searched variants at once
+BOOKS_VERSION_KEY = 'books_ver'
+
+# Per-process layer in front of the shared cache for single-book reads,
+# holding serialized response bodies keyed on (book_id, books version)
+_local_books = TTLCache(maxsize=10000, ttl=60)
+_local_books_lock = threading.Lock()
+
+# Per-process copy of the books version, so local hits skip the shared
+# cache; other workers' writes become visible within this many seconds
+LOCAL_VERSION_TTL = 1
+_local_version = TTLCache(maxsize=1, ttl=LOCAL_VERSION_TTL)
+
+def books_version(cache):
+    """Return the current book collection version, starting one if missing"""
+    version = cache.get(BOOKS_VERSION_KEY)
+    if version is None:
+        version = bump_books_version(cache)
+    return version
+
+def bump_books_version(cache):
+    """Invalidate every cached book list in a single write"""
+    # A timestamp rather than INCR keeps versions increasing even if the
+    # key is evicted, so an old version can never be reused
+    version = time.time_ns()
+    cache.set(BOOKS_VERSION_KEY, version, timeout=0)
+    with _local_books_lock:
+        _local_version[BOOKS_VERSION_KEY] = version
+    return version
+
+def local_books_version(cache):
+    """Return the books version, reading the shared cache at most every LOCAL_VERSION_TTL seconds"""
+    with _local_books_lock:
+        version = _local_version.get(BOOKS_VERSION_KEY)
+    if version is None:
+        version = books_version(cache)
+        with _local_books_lock:
+            _local_version[BOOKS_VERSION_KEY] = version
+    return version
+
+def books_cache_key(cache):
+    """Cache key for the current book list request"""
+    # Remember the version the body is built from for compressed_cache_key
+    g.books_version = books_version(cache)
+    query_string = urlencode(sorted(request.args.items(multi=True)))
+    return f"books_v{g.books_version}:{request.path}?{query_string}"
+
+def cached_book_body(cache, book_id, render):
+    """Return the serialized response for a book, rendering it on a miss.
+
+    Checks the in-process cache first, then the shared cache, and only
+    calls render() when both miss. Local entries are keyed on the books
+    version, so a mutation invalidates them at once in the worker that
+    made it and within LOCAL_VERSION_TTL seconds in every other worker.
+    """
+    g.books_version = local_books_version(cache)
+    key = (book_id, g.books_version)
+    with _local_books_lock:
+        body = _local_books.get(key)
+    if body is not None:
+        return body
+
+    body = cache.get(f'book{book_id}')
+    if body is None:
+        body = render()
+        cache.set(f'book{book_id}', body, timeout=300)
+    with _local_books_lock:
+        _local_books[key] = body
+    return body
+
+class CompressedBodyCache:
+    """Flask-Compress cache backend that keeps compressed GET bodies in the shared cache.
+
+    Only GET responses are cached, since other methods share a path but
+    not a body. Flask-Compress writes back every value it reads, so a
+    write right after a hit is skipped.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, key):
+        if request.method != 'GET':
+            return None
+        value = self.cache.get(key)
+        if value is not None:
+            g.compressed_cache_hit = key
+        return value
+
+    def set(self, key, value):
+        if request.method != 'GET' or g.get('compressed_cache_hit') == key:
+            return
+        self.cache.set(key, value, timeout=300)
+
+def compressed_cache_key(cache):
+    """Cache key for the compressed body of the current GET request.
+
+    Keyed on the books version the uncompressed body was built from, so a
+    body served from an older version is never stored under a newer one.
+    """
+    version = g.get('books_version')
+    if version is None:
+        version = local_books_version(cache)
+    query_string = urlencode(sorted(request.args.items(multi=True)))
+    return f"compressed:books_v{version}:{request.path}?{query_string}"
+
+def invalidate_many(cache, keys):
+    """Delete several cache keys in a single round-trip when possible"""
+    keys = list(keys)
+    # Redis backends expose the underlying client; one DEL removes every key
+    client = getattr(cache.cache, '_write_client', None)
+    if client is None:
+        cache.delete_many(*keys)
+        return
+    try:
+        prefix = cache.cache._get_prefix()
+        client.delete(*(f"{prefix}{key}" for key in keys))
+    except Exception as e:
+        logger.warning("Batched cache invalidation failed, deleting keys one by one: %s", e)
+        for key in keys:
+            cache.delete(key)
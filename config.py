@@ -1,9 +1,22 @@
 import os
 from datetime import timedelta
+from urllib.parse import quote
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 
 load_dotenv()
 
+def _redis_url():
+    """Return REDIS_URL, or build it from the older REDIS_HOST/PORT/PASSWORD/DB settings"""
+    if os.getenv('REDIS_URL'):
+        return os.getenv('REDIS_URL')
+    password = os.getenv('REDIS_PASSWORD', '')
+    auth = f":{quote(password, safe='')}@" if password else ''
+    host = os.getenv('REDIS_HOST', 'localhost')
+    port = int(os.getenv('REDIS_PORT', 6379))
+    db = int(os.getenv('REDIS_DB', 0))
+    return f"redis://{auth}{host}:{port}/{db}"
+
 class BaseConfig:
     """Base configuration"""
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
@@ -17,9 +30,15 @@ class BaseConfig:
     SWAGGER_UI_DOC_EXPANSION = 'list'
     RESTX_MASK_SWAGGER = False
     # Cache configuration
-    CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')  # Use Redis in production
+    # Redis by default so every worker shares one cache and invalidation
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'RedisCache')
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
     CACHE_KEY_PREFIX = 'book_manager_'
+    CACHE_REDIS_URL = _redis_url()
+    CACHE_REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    # Response compression
+    COMPRESS_MIMETYPES = ['application/json']
+    COMPRESS_LEVEL = 5
 
 class DevelopmentConfig(BaseConfig):
     """Development configuration"""
@@ -28,30 +47,47 @@ class DevelopmentConfig(BaseConfig):
     # More permissive CORS in development
     CORS_HEADERS = 'Content-Type'
     # Use simple cache in development
-    CACHE_TYPE = 'simple'
+    CACHE_TYPE = 'SimpleCache'
 
 class TestingConfig(BaseConfig):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    # In-memory database on one shared connection, so create_all/drop_all
+    # per test never touch the disk
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False}
+    }
     # Disable CSRF protection in testing
     WTF_CSRF_ENABLED = False
-    # Disable caching in testing
-    CACHE_TYPE = 'null'
+    # Use an in-process cache in testing
+    CACHE_TYPE = 'SimpleCache'
+    # The session-scoped test client shares one in-memory limiter bucket
+    # across the whole suite, so rate limits would start returning 429s
+    RATELIMIT_ENABLED = False
 
 class ProductionConfig(BaseConfig):
     """Production configuration"""
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
+    # Connection pool sized to the gunicorn threads per worker, with dead
+    # connections detected before use and recycled before server-side timeouts.
+    # psycopg2 sends multi-row INSERTs 1000 rows at a time and batches other
+    # executemany statements with execute_batch
+    POOL_SIZE = max(2, int(os.getenv('GUNICORN_THREADS', '4')) + 2)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': POOL_SIZE,
+        'max_overflow': POOL_SIZE * 2,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'insertmanyvalues_page_size': 1000,
+        'executemany_mode': 'values_plus_batch',
+        'executemany_batch_page_size': 500
+    }
     # Stricter CORS in production
     CORS_HEADERS = 'Content-Type'
     CORS_ORIGINS = os.getenv('ALLOWED_ORIGINS', '').split(',')
-    # Use Redis cache in production if configured
-    CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')
-    CACHE_REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
-    CACHE_REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
-    CACHE_REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', '')
-    CACHE_REDIS_DB = int(os.getenv('REDIS_DB', 0))
 
 # Configuration dictionary
 config = {
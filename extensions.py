@@ -0,0 +1,15 @@
+from flask_caching import Cache
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+
+# Extensions are created here and bound to the app in app.py, so route
+# modules can import them without importing the app itself
+cache = Cache()
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["200 per day", "50 per hour"]
+)
+
+compress = Compress()
@@ -0,0 +1,22 @@
+import os
+
+# Gunicorn settings, loaded automatically from the working directory
+bind = '0.0.0.0:5000'
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+
+# Threaded workers let each process keep serving requests while others
+# wait on PostgreSQL or Redis; the database pool is sized to match.
+# GUNICORN_WORKER_CLASS=gevent switches to greenlet workers instead
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+if worker_class == 'gevent':
+    # gevent ignores threads and would otherwise run up to 1000 greenlets
+    # per worker; cap them at the count the database pool is sized from
+    worker_connections = threads
+
+def post_fork(server, worker):
+    # psycopg2 blocks the whole process on each query unless it is told to
+    # yield to the gevent hub; this must run before the app opens connections
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
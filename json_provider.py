@@ -0,0 +1,30 @@
+import orjson
+from flask import make_response
+from flask.json.provider import JSONProvider
+
+# Error payloads can be keyed by list index, which plain JSON does not allow
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def dumps(obj):
+    """Serialize obj to JSON bytes with orjson"""
+    return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round-trip of the default implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype='application/json')
+
+def output_json(data, code, headers=None):
+    """Flask-RESTX representation for application/json using orjson"""
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+    return response
@@ -1,6 +1,8 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 def setup_logger():
     # Create logs directory if it doesn't exist
@@ -10,12 +12,14 @@ def setup_logger():
     # Configure logging
     logger = logging.getLogger('book_manager')
     logger.setLevel(logging.INFO)
+    logger.propagate = False
 
-    # Create handlers
+    # Create handlers; the log file is only opened on the first write
     file_handler = RotatingFileHandler(
-        'logs/book_manager.log', 
+        'logs/book_manager.log',
         maxBytes=10485760,  # 10MB
-        backupCount=5
+        backupCount=5,
+        delay=True
     )
     console_handler = logging.StreamHandler()
 
@@ -26,8 +30,13 @@ def setup_logger():
     file_handler.setFormatter(log_format)
     console_handler.setFormatter(log_format)
 
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Hand records to a background thread so file and console I/O
+    # happen off the request thread
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
 
-    return logger
\ No newline at end of file
+    logger.addHandler(QueueHandler(log_queue))
+
+    return logger
@@ -0,0 +1,37 @@
+"""add book column trigram indexes
+
+Revision ID: add_book_column_trgm_indexes
+Revises: add_book_covering_indexes
+Create Date: 2026-10-14 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_book_column_trgm_indexes'
+down_revision = 'add_book_covering_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Trigram indexes are PostgreSQL only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Index the columns themselves so ILIKE '%q%' on title, author and
+    # summary can be answered by a bitmap OR across the three GIN indexes
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.drop_index('idx_book_title_trgm', table_name='book')
+    op.drop_index('idx_book_author_trgm', table_name='book')
+    op.create_index('idx_book_title_trgm', 'book', ['title'], postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('idx_book_author_trgm', 'book', ['author'], postgresql_using='gin', postgresql_ops={'author': 'gin_trgm_ops'})
+    op.create_index('idx_book_summary_trgm', 'book', ['summary'], postgresql_using='gin', postgresql_ops={'summary': 'gin_trgm_ops'})
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('idx_book_summary_trgm', table_name='book')
+    op.drop_index('idx_book_author_trgm', table_name='book')
+    op.drop_index('idx_book_title_trgm', table_name='book')
+    op.create_index('idx_book_title_trgm', 'book', [sa.text("lower(title) gin_trgm_ops")], postgresql_using='gin')
+    op.create_index('idx_book_author_trgm', 'book', [sa.text("lower(author) gin_trgm_ops")], postgresql_using='gin')
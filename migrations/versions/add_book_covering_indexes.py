@@ -0,0 +1,33 @@
+"""add book covering indexes
+
+Revision ID: add_book_covering_indexes
+Revises: add_book_trgm_indexes
+Create Date: 2026-10-14 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_book_covering_indexes'
+down_revision = 'add_book_trgm_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Replace the single-column indexes with (sort column, id) indexes that
+    # also carry the listed columns, so keyset pages are index-only scans
+    op.drop_index('idx_book_title', table_name='book')
+    op.drop_index('idx_book_author', table_name='book')
+    op.drop_index('idx_book_published_date', table_name='book')
+    op.create_index('idx_book_title_cov', 'book', ['title', 'id'], postgresql_include=['author', 'published_date'])
+    op.create_index('idx_book_author_cov', 'book', ['author', 'id'], postgresql_include=['title', 'published_date'])
+    op.create_index('idx_book_published_date_cov', 'book', ['published_date', 'id'], postgresql_include=['title', 'author'])
+
+def downgrade():
+    op.drop_index('idx_book_title_cov', table_name='book')
+    op.drop_index('idx_book_author_cov', table_name='book')
+    op.drop_index('idx_book_published_date_cov', table_name='book')
+    op.create_index('idx_book_title', 'book', ['title'])
+    op.create_index('idx_book_author', 'book', ['author'])
+    op.create_index('idx_book_published_date', 'book', ['published_date'])
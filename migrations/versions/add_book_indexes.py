@@ -15,13 +15,11 @@ branch_labels = None
 depends_on = None
 
 def upgrade():
-    # Create indexes for commonly searched fields
-    op.create_index('idx_book_title', 'book', ['title'])
-    op.create_index('idx_book_author', 'book', ['author'])
-    op.create_index('idx_book_published_date', 'book', ['published_date'])
+    # idx_book_title, idx_book_author and idx_book_published_date are already
+    # created by the initial migration; creating them again fails, and they
+    # are superseded by add_book_covering_indexes anyway
+    pass
 
 def downgrade():
-    # Remove indexes
-    op.drop_index('idx_book_title', table_name='book')
-    op.drop_index('idx_book_author', table_name='book')
-    op.drop_index('idx_book_published_date', table_name='book')
\ No newline at end of file
+    # The indexes belong to the initial migration, which drops them
+    pass
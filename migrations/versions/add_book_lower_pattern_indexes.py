@@ -0,0 +1,29 @@
+"""add book lower() pattern indexes
+
+Revision ID: add_book_lower_pattern_indexes
+Revises: add_book_column_trgm_indexes
+Create Date: 2026-10-14 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_book_lower_pattern_indexes'
+down_revision = 'add_book_column_trgm_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # text_pattern_ops is PostgreSQL only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Functional indexes for lower(column) LIKE 'q%' prefix searches
+    op.create_index('idx_book_title_lower', 'book', [sa.text("lower(title) text_pattern_ops")])
+    op.create_index('idx_book_author_lower', 'book', [sa.text("lower(author) text_pattern_ops")])
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('idx_book_author_lower', table_name='book')
+    op.drop_index('idx_book_title_lower', table_name='book')
@@ -0,0 +1,32 @@
+"""add book full-text search vector
+
+Revision ID: add_book_search_vector
+Revises: add_book_indexes
+Create Date: 2026-10-14 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# revision identifiers, used by Alembic.
+revision = 'add_book_search_vector'
+down_revision = 'add_book_indexes'
+branch_labels = None
+depends_on = None
+
+# Must stay in sync with models.SEARCH_VECTOR
+SEARCH_VECTOR = "to_tsvector('english', title || ' ' || author || ' ' || coalesce(summary, ''))"
+
+def upgrade():
+    # Full-text search is PostgreSQL only; other databases keep the LIKE search
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.add_column('book', sa.Column('search_vector', TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)))
+    op.create_index('idx_book_fts', 'book', ['search_vector'], postgresql_using='gin')
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('idx_book_fts', table_name='book')
+    op.drop_column('book', 'search_vector')
@@ -0,0 +1,29 @@
+"""add book trigram indexes
+
+Revision ID: add_book_trgm_indexes
+Revises: add_book_search_vector
+Create Date: 2026-10-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_book_trgm_indexes'
+down_revision = 'add_book_search_vector'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Trigram indexes are PostgreSQL only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('idx_book_title_trgm', 'book', [sa.text("lower(title) gin_trgm_ops")], postgresql_using='gin')
+    op.create_index('idx_book_author_trgm', 'book', [sa.text("lower(author) gin_trgm_ops")], postgresql_using='gin')
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('idx_book_title_trgm', table_name='book')
+    op.drop_index('idx_book_author_trgm', table_name='book')
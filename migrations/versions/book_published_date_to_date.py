@@ -0,0 +1,68 @@
+"""store book published_date as date
+
+Values that have the YYYY-MM-DD shape but are not real dates (such as
+2023-02-30 or 0000-00-00) cannot be converted and are set to NULL, so
+they are lost.
+
+Revision ID: book_published_date_to_date
+Revises: add_book_lower_pattern_indexes
+Create Date: 2026-10-14 14:00:00.000000
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'book_published_date_to_date'
+down_revision = 'add_book_lower_pattern_indexes'
+branch_labels = None
+depends_on = None
+
+def _is_date(value):
+    # Same YYYY-MM-DD shape check as schemas._is_iso_date: fromisoformat
+    # also takes 10-character values like 2024-W01-1 that ::date rejects
+    shaped = (
+        len(value) == 10 and value[4] == '-' and value[7] == '-'
+        and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()
+    )
+    if not shaped:
+        return False
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+def upgrade():
+    # Clear values the cast would reject, which would abort the migration
+    book = sa.table('book', sa.column('id', sa.Integer), sa.column('published_date', sa.String))
+    rows = op.get_bind().execute(
+        sa.select(book.c.id, book.c.published_date).where(book.c.published_date.isnot(None))
+    )
+    invalid_ids = [row.id for row in rows if not _is_date(row.published_date)]
+    if invalid_ids:
+        op.execute(book.update().where(book.c.id.in_(invalid_ids)).values(published_date=None))
+
+    # SQLite stores dates as YYYY-MM-DD text already, and its batch table
+    # copy would CAST them to DATE's numeric affinity (2024-01-02 -> 2024)
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    # PostgreSQL rewrites the column in place and rebuilds
+    # idx_book_published_date_cov over the new type
+    with op.batch_alter_table('book', schema=None) as batch_op:
+        batch_op.alter_column('published_date',
+                              existing_type=sa.String(length=10),
+                              type_=sa.Date(),
+                              existing_nullable=True,
+                              postgresql_using='published_date::date')
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    with op.batch_alter_table('book', schema=None) as batch_op:
+        batch_op.alter_column('published_date',
+                              existing_type=sa.Date(),
+                              type_=sa.String(length=10),
+                              existing_nullable=True,
+                              postgresql_using="to_char(published_date, 'YYYY-MM-DD')")
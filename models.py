@@ -1,29 +1,175 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import or_, Index
+from sqlalchemy import or_, and_, tuple_, any_, bindparam, false, func, text, Computed, Index
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
 
 db = SQLAlchemy()
 
+# Words indexed for full-text search; migrations/versions/add_book_search_vector.py
+# creates the same generated column
+SEARCH_VECTOR = "to_tsvector('english', title || ' ' || author || ' ' || coalesce(summary, ''))"
+
+# Shorter queries are matched as prefixes; trigram indexes need 3 characters
+MIN_SEARCH_LENGTH = 3
+
 class Book(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     author = db.Column(db.String(100), nullable=False)
-    published_date = db.Column(db.String(10), nullable=True)
+    published_date = db.Column(db.Date, nullable=True)
     summary = db.Column(db.Text, nullable=True)
+    # Generated by PostgreSQL and only ever read inside search filters
+    search_vector = db.Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True))
 
-    # Add indexes for commonly searched fields
+    # Covering (sort column, id) indexes so keyset-paginated lists can be
+    # served by index-only scans on PostgreSQL, plus the full-text,
+    # trigram and lower() pattern indexes (PostgreSQL only) that serve search
     __table_args__ = (
-        Index('idx_book_title', 'title'),
-        Index('idx_book_author', 'author'),
-        Index('idx_book_published_date', 'published_date'),
+        Index('idx_book_title_cov', 'title', 'id', postgresql_include=['author', 'published_date']),
+        Index('idx_book_author_cov', 'author', 'id', postgresql_include=['title', 'published_date']),
+        Index('idx_book_published_date_cov', 'published_date', 'id', postgresql_include=['title', 'author']),
+        Index('idx_book_fts', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('idx_book_title_trgm', 'title', postgresql_using='gin',
+              postgresql_ops={'title': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('idx_book_author_trgm', 'author', postgresql_using='gin',
+              postgresql_ops={'author': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('idx_book_summary_trgm', 'summary', postgresql_using='gin',
+              postgresql_ops={'summary': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('idx_book_title_lower', text('lower(title) text_pattern_ops')).ddl_if(dialect='postgresql'),
+        Index('idx_book_author_lower', text('lower(author) text_pattern_ops')).ddl_if(dialect='postgresql'),
     )
+    # Keep search_vector in the table but out of every ORM SELECT and RETURNING
+    __mapper_args__ = {'exclude_properties': ['search_vector']}
+
+    # Eager-load options applied when endpoints load Book instances (the
+    # list endpoint selects plain columns instead). Add a
+    # selectinload()/joinedload() here for every relationship added to Book
+    # so serializing costs one extra query per relationship instead of one
+    # per row.
+    DEFAULT_LOAD_OPTIONS = ()
 
     @classmethod
     def search(cls, query):
-        """Search books by title, author, or summary"""
+        """Search books by title, author, or summary; queries under MIN_SEARCH_LENGTH match prefixes only"""
+        query = (query or '').strip()
+        if not query:
+            return cls.query.filter(false())
+        if len(query) < MIN_SEARCH_LENGTH:
+            return cls.search_prefix(query)
+        return cls.query.filter(cls.search_criterion(query))
+
+    @classmethod
+    def search_criterion(cls, query):
+        """Criterion matching title, author, or summary substrings of query.
+
+        On PostgreSQL it adds full-text and trigram similarity matches.
+        """
+        pattern = f"%{_escape_like(query)}%"
+        criteria = [
+            cls.title.ilike(pattern, escape='\\'),
+            cls.author.ilike(pattern, escape='\\'),
+            cls.summary.ilike(pattern, escape='\\')
+        ]
+        if db.engine.dialect.name == 'postgresql':
+            criteria += [
+                cls.__table__.c.search_vector.op('@@')(func.plainto_tsquery('english', query)),
+                cls.title.op('%')(query),
+                cls.author.op('%')(query)
+            ]
+        return or_(*criteria)
+
+    @classmethod
+    def search_prefix(cls, query):
+        """Search books whose title or author starts with query"""
+        pattern = f"{_escape_like(query.lower())}%"
         return cls.query.filter(
             or_(
-                cls.title.ilike(f"%{query}%"),
-                cls.author.ilike(f"%{query}%"),
-                cls.summary.ilike(f"%{query}%")
+                func.lower(cls.title).like(pattern, escape='\\'),
+                func.lower(cls.author).like(pattern, escape='\\')
             )
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    def id_matches(cls, ids):
+        """Criterion matching books whose id is in ids, bound as one array on PostgreSQL"""
+        if db.engine.dialect.name == 'postgresql':
+            return cls.id == any_(bindparam('ids', list(ids), type_=ARRAY(db.Integer)))
+        return cls.id.in_(ids)
+
+    @classmethod
+    def seek(cls, query, sort_field=None, order='asc', cursor=None, cursor_id=None):
+        """Order query by (sort_field, id) and resume after the given cursor.
+
+        NULL sort values sort last ascending and first descending.
+        """
+        descending = order == 'desc'
+        if not sort_field:
+            query = query.order_by(cls.id.desc() if descending else cls.id)
+            if cursor_id is not None:
+                query = query.filter(cls.id < cursor_id if descending else cls.id > cursor_id)
+            return query
+
+        column, nullable = _SORT_COLUMNS[sort_field]
+        if descending:
+            query = query.order_by(column.desc().nulls_first(), cls.id.desc())
+        else:
+            query = query.order_by(column.asc().nulls_last(), cls.id)
+        if cursor_id is None:
+            return query
+
+        if cursor is None:
+            # Previous page ended inside the NULL group
+            after_null = cls.id < cursor_id if descending else cls.id > cursor_id
+            if descending:
+                return query.filter(or_(and_(column.is_(None), after_null), column.isnot(None)))
+            return query.filter(column.is_(None), after_null)
+
+        if descending:
+            return query.filter(tuple_(column, cls.id) < (cursor, cursor_id))
+        criterion = tuple_(column, cls.id) > (cursor, cursor_id)
+        if nullable:
+            criterion = or_(criterion, column.is_(None))
+        return query.filter(criterion)
+
+    @classmethod
+    def approx_count(cls, query):
+        """Estimate the number of rows matched by query, from planner statistics on PostgreSQL"""
+        if db.engine.dialect.name != 'postgresql':
+            return query.order_by(None).count()
+
+        if query.whereclause is None:
+            estimate = db.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+                {'table': cls.__tablename__}
+            ).scalar()
+        else:
+            compiled = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+            plan = db.session.connection().exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            ).scalar()
+            estimate = plan[0]['Plan']['Plan Rows']
+
+        if estimate is None or estimate < 0:
+            return query.order_by(None).count()
+        return int(estimate)
+
+
+def _escape_like(value):
+    """Escape LIKE metacharacters so they match literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+@compiles(CreateColumn, 'sqlite')
+def _omit_search_vector(element, compiler, **kw):
+    # SQLite has no tsvector, so tables created there skip the column
+    if element.element.name == 'search_vector':
+        return None
+    return compiler.visit_create_column(element, **kw)
+
+
+# Sortable columns resolved once at import, with whether they can hold NULL
+_SORT_COLUMNS = {
+    name: (getattr(Book, name), Book.__table__.c[name].nullable)
+    for name in ('title', 'author', 'published_date')
+}
@@ -1,8 +1,52 @@
+import orjson
 from marshmallow import Schema, fields, validate
 
+def _is_iso_date(value):
+    """Check for the YYYY-MM-DD shape with plain string comparisons"""
+    return (
+        isinstance(value, str) and len(value) == 10 and value[4] == '-' and value[7] == '-'
+        and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()
+    )
+
+class ISODate(fields.Date):
+    """Date field that only accepts the extended YYYY-MM-DD form.
+
+    date.fromisoformat also parses basic (20240101) and week dates on
+    Python 3.11+, which the API has never accepted.
+    """
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not _is_iso_date(value):
+            raise self.make_error('invalid')
+        return super()._deserialize(value, attr, data, **kwargs)
+
 class BookSchema(Schema):
+    class Meta:
+        render_module = orjson
+
     id = fields.Int(dump_only=True)
     title = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     author = fields.Str(required=True, validate=validate.Length(min=1, max=100))
-    published_date = fields.Str(validate=validate.Regexp(r'^\d{4}-\d{2}-\d{2}$'))
-    summary = fields.Str()
\ No newline at end of file
+    published_date = ISODate()
+    summary = fields.Str()
+
+# Shared instances, so fields and validators are resolved once per process
+book_schema = BookSchema()
+books_schema = BookSchema(many=True)
+
+def fast_dump(book, include_summary=True):
+    """Serialize a Book, or a row of its columns, without marshmallow's per-field dispatch.
+
+    Must emit the same fields and formats as BookSchema.dump; the shape is
+    fixed, so the read endpoints build the dict directly. Pass
+    include_summary=False when the summary column was not selected.
+    """
+    data = {
+        'id': book.id,
+        'title': book.title,
+        'author': book.author,
+        'published_date': book.published_date.isoformat() if book.published_date else None
+    }
+    if include_summary:
+        data['summary'] = book.summary
+    return data
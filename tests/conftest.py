@@ -1,28 +1,98 @@
+import os
 import pytest
+from datetime import date
+from sqlalchemy import event
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+# Select TestingConfig before the app module builds its extensions
+os.environ['FLASK_ENV'] = 'testing'
+
 from app import app as flask_app
+from caching import bump_books_version
+from extensions import cache
 from models import db, Book
 
-@pytest.fixture
+@event.listens_for(Session, 'do_orm_execute')
+def fail_on_lazy_load(orm_execute_state):
+    # Lazy relationship loads are N+1 queries on list endpoints; eager-load
+    # new relationships through Book.DEFAULT_LOAD_OPTIONS instead
+    if orm_execute_state.is_relationship_load and orm_execute_state.lazy_loaded_from is not None:
+        raise AssertionError(f"Lazy load of {orm_execute_state.loader_strategy_path}")
+
+def use_sqlite_transactions(engine):
+    # pysqlite defers BEGIN until the first DML statement, which breaks
+    # SAVEPOINTs; let SQLAlchemy emit BEGIN itself
+    @event.listens_for(engine, 'connect')
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+    # Reconnect so the listeners apply to the shared in-memory connection
+    engine.dispose()
+
+@pytest.fixture(scope='session')
 def app():
     flask_app.config.from_object('config.TestingConfig')
     with flask_app.app_context():
+        use_sqlite_transactions(db.engine)
         db.create_all()
         yield flask_app
         db.session.remove()
         db.drop_all()
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def db_session(app):
+    """Run each test in a transaction that is rolled back afterwards.
+
+    The app's own commits only release SAVEPOINTs inside it, so nothing a
+    test writes outlives the test, and the schema is built once.
+    """
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    session = scoped_session(sessionmaker(
+        bind=connection, query_cls=db.Query, join_transaction_mode='create_savepoint'
+    ))
+    app_session, db.session = db.session, session
+    yield session
+    session.remove()
+    transaction.rollback()
+    connection.close()
+    db.session = app_session
+    cache.clear()
+    # Move this process's cached books version on as well
+    bump_books_version(cache)
+
+@pytest.fixture(scope='session')
 def client(app):
     return app.test_client()
 
 @pytest.fixture
-def sample_book():
+def sample_book(db_session):
     book = Book(
         title="Test Book",
         author="Test Author",
-        published_date="2024-01-01",
+        published_date=date(2024, 1, 1),
         summary="Test Summary"
     )
-    db.session.add(book)
-    db.session.commit()
-    return book
\ No newline at end of file
+    db_session.add(book)
+    db_session.commit()
+    return book
+
+@pytest.fixture
+def sample_books(db_session):
+    """Insert n books with one executemany INSERT and return their ids"""
+    def create(n, **values):
+        rows = [
+            {'title': f"Book {i}", 'author': f"Author {i}", 'published_date': date(2024, 1, 1),
+             'summary': "Summary", **values}
+            for i in range(n)
+        ]
+        ids = db_session.scalars(
+            Book.__table__.insert().returning(Book.__table__.c.id, sort_by_parameter_order=True), rows
+        ).all()
+        db_session.commit()
+        return ids
+    return create
@@ -1,7 +1,13 @@
+import gzip
 import json
+import caching
+from datetime import date
+from extensions import cache
+from models import db, Book
+from schemas import BookSchema, fast_dump
 
 def test_get_books(client):
-    response = client.get('/books')
+    response = client.get('/api/v1/books')
     assert response.status_code == 200
     data = json.loads(response.data)
     assert "status" in data
@@ -15,11 +21,7 @@ def test_create_book(client):
         "published_date": "2024-02-01",
         "summary": "New Test Summary"
     }
-    response = client.post(
-        '/books',
-        data=json.dumps(book_data),
-        content_type='application/json'
-    )
+    response = client.post('/api/v1/books', json=book_data)
     assert response.status_code == 201
     data = json.loads(response.data)
     assert data["status"] == "success"
@@ -31,11 +33,7 @@ def test_update_book(client, sample_book):
         "title": "Updated Book",
         "author": "Updated Author"
     }
-    response = client.put(
-        f'/books/{sample_book.id}',
-        data=json.dumps(update_data),
-        content_type='application/json'
-    )
+    response = client.put(f'/api/v1/books/{sample_book.id}', json=update_data)
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data["status"] == "success"
@@ -43,13 +41,13 @@ def test_update_book(client, sample_book):
     assert data["data"]["author"] == update_data["author"]
 
 def test_delete_book(client, sample_book):
-    response = client.delete(f'/books/{sample_book.id}')
+    response = client.delete(f'/api/v1/books/{sample_book.id}')
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data["status"] == "success"
     
     # Verify book is deleted
-    response = client.get(f'/books/{sample_book.id}')
+    response = client.get(f'/api/v1/books/{sample_book.id}')
     assert response.status_code == 404
 
 def test_create_book_invalid_data(client):
@@ -57,11 +55,184 @@ def test_create_book_invalid_data(client):
         "title": "",  # Invalid empty title
         "author": "Test Author"
     }
-    response = client.post(
-        '/books',
-        data=json.dumps(book_data),
-        content_type='application/json'
-    )
+    response = client.post('/api/v1/books', json=book_data)
     assert response.status_code == 400
     data = json.loads(response.data)
-    assert "error" in data
\ No newline at end of file
+    assert "error" in data
+
+def test_create_book_invalid_date(client):
+    for published_date in ["2024-13-45", "20240101", "2024-W01-1"]:
+        book_data = {
+            "title": "Test Book",
+            "author": "Test Author",
+            "published_date": published_date
+        }
+        response = client.post('/api/v1/books', json=book_data)
+        assert response.status_code == 400
+
+def test_get_books_keyset_pagination(client):
+    for title, published_date in [("B", date(2024, 1, 2)), ("A", None), ("C", date(2024, 1, 1)), ("D", date(2024, 1, 2))]:
+        db.session.add(Book(title=title, author="Author", published_date=published_date))
+    db.session.commit()
+
+    for order, expected in [("asc", ["C", "B", "D", "A"]), ("desc", ["A", "D", "B", "C"])]:
+        titles = []
+        url = f'/api/v1/books?sort=published_date&order={order}&per_page=3'
+        while url:
+            data = json.loads(client.get(url).data)
+            assert data["total_items"] == 4
+            titles.extend(book["title"] for book in data["data"])
+            cursor = data["next_cursor"]
+            url = None
+            if cursor:
+                url = f'/api/v1/books?sort=published_date&order={order}&per_page=3&cursor_id={cursor["cursor_id"]}'
+                if cursor["cursor"] is not None:
+                    url += f'&cursor={cursor["cursor"]}'
+        assert titles == expected
+
+def test_create_book_invalidates_cached_lists(client):
+    response = client.get('/api/v1/books?sort=title&per_page=5')
+    assert json.loads(response.data)["data"] == []
+
+    client.post('/api/v1/books', json={"title": "Cached Book", "author": "Cached Author"})
+    response = client.get('/api/v1/books?sort=title&per_page=5')
+    assert [book["title"] for book in json.loads(response.data)["data"]] == ["Cached Book"]
+
+def test_bulk_delete_books(client, sample_books):
+    ids = sample_books(3)[:2]
+
+    response = client.delete('/api/v1/books/bulk', json={"ids": ids})
+    assert response.status_code == 200
+    assert json.loads(response.data)["message"] == "Successfully deleted 2 books"
+    assert [book.title for book in Book.query.all()] == ["Book 2"]
+
+def test_bulk_create_books(client):
+    books_data = [
+        {"title": "Bulk One", "author": "Bulk Author", "published_date": "2024-03-01"},
+        {"title": "Bulk Two", "author": "Bulk Author"}
+    ]
+    response = client.post('/api/v1/books/bulk', json={"books": books_data})
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert [book["title"] for book in data["data"]] == ["Bulk One", "Bulk Two"]
+    assert all(book["id"] for book in data["data"])
+    assert Book.query.count() == 2
+
+def test_bulk_create_books_invalid_data(client):
+    books_data = [
+        {"title": "Valid Book", "author": "Valid Author"},
+        {"title": "", "author": "Invalid Author"}
+    ]
+    response = client.post('/api/v1/books/bulk', json={"books": books_data})
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert [error["index"] for error in data["errors"]] == [1]
+    assert "title" in data["errors"][0]["errors"]
+    assert Book.query.count() == 0
+
+def test_fast_dump_matches_schema(app, sample_book):
+    assert fast_dump(sample_book) == BookSchema().dump(sample_book)
+
+def test_get_books_summary_is_opt_in(client, sample_book):
+    data = json.loads(client.get('/api/v1/books?per_page=5').data)
+    assert "summary" not in data["data"][0]
+
+    data = json.loads(client.get('/api/v1/books?per_page=5&fields=summary').data)
+    assert data["data"][0]["summary"] == sample_book.summary
+
+    response = client.get('/api/v1/books?per_page=5&fields=summary,isbn')
+    assert response.status_code == 400
+
+def test_get_book_after_update(client, sample_book):
+    response = client.get(f'/api/v1/books/{sample_book.id}')
+    assert response.status_code == 200
+    assert json.loads(response.data)["data"]["title"] == "Test Book"
+
+    client.put(
+        f'/api/v1/books/{sample_book.id}',
+        json={"title": "Renamed Book", "author": "Test Author"}
+    )
+    response = client.get(f'/api/v1/books/{sample_book.id}')
+    assert json.loads(response.data)["data"]["title"] == "Renamed Book"
+
+def test_local_book_hit_skips_shared_cache(client, sample_book, monkeypatch):
+    client.get(f'/api/v1/books/{sample_book.id}')
+
+    shared_reads = []
+    monkeypatch.setattr(cache, 'get', lambda key: shared_reads.append(key))
+    response = client.get(f'/api/v1/books/{sample_book.id}')
+    assert json.loads(response.data)["data"]["title"] == "Test Book"
+    assert shared_reads == []
+
+def test_local_compressed_book_hit_reads_only_compressed_body(client, sample_book, monkeypatch):
+    # Flask-Compress skips bodies under COMPRESS_MIN_SIZE
+    sample_book.summary = "Summary " * 100
+    db.session.commit()
+    client.get(f'/api/v1/books/{sample_book.id}', headers={'Accept-Encoding': 'gzip'})
+
+    shared_reads = []
+    monkeypatch.setattr(cache, 'get', lambda key: shared_reads.append(key))
+    client.get(f'/api/v1/books/{sample_book.id}', headers={'Accept-Encoding': 'gzip'})
+    assert len(shared_reads) == 1
+    assert shared_reads[0].startswith('gzip;compressed:')
+
+def test_compressed_book_after_bump_in_another_worker(client, sample_book):
+    url = f'/api/v1/books/{sample_book.id}'
+    sample_book.summary = "Summary " * 100
+    db.session.commit()
+    gzip_headers = {'Accept-Encoding': 'gzip'}
+    client.get(url, headers=gzip_headers)
+
+    # Another worker updates the book, leaving this one's local version behind
+    sample_book.title = "Renamed Book"
+    db.session.commit()
+    cache.delete(f'book{sample_book.id}')
+    cache.set(caching.BOOKS_VERSION_KEY, caching.books_version(cache) + 1, timeout=0)
+    client.get(url, headers=gzip_headers)
+
+    caching._local_version.clear()
+    response = client.get(url, headers=gzip_headers)
+    assert json.loads(gzip.decompress(response.data))["data"]["title"] == "Renamed Book"
+
+def test_get_books_invalid_query(client):
+    assert client.get('/api/v1/books?per_page=abc').status_code == 400
+    assert client.get('/api/v1/books?sort=summary').status_code == 400
+    assert client.get('/api/v1/books?order=sideways').status_code == 400
+
+def test_search_matches_wildcards_literally(client):
+    db.session.add_all([
+        Book(title="100% Cotton", author="Weaver"),
+        Book(title="1000 Cranes", author="Folder"),
+        Book(title="snake_case", author="Pythonista"),
+        Book(title="snakes and ladders", author="Gamer")
+    ])
+    db.session.commit()
+
+    data = json.loads(client.get('/api/v1/books?q=100%25').data)
+    assert [book["title"] for book in data["data"]] == ["100% Cotton"]
+    data = json.loads(client.get('/api/v1/books?q=snake_').data)
+    assert [book["title"] for book in data["data"]] == ["snake_case"]
+    assert [book.title for book in Book.search_prefix("snake_")] == ["snake_case"]
+
+def test_short_search_matches_prefixes(client):
+    db.session.add_all([Book(title="Boat", author="Sailor"), Book(title="A Boat", author="Rower")])
+    db.session.commit()
+
+    for q in ["Bo", "bo", "  Bo  "]:
+        data = json.loads(client.get(f'/api/v1/books?q={q}').data)
+        assert [book["title"] for book in data["data"]] == ["Boat"]
+
+def test_blank_search_matches_nothing(client, sample_book):
+    data = json.loads(client.get('/api/v1/books?q=%20').data)
+    assert data["data"] == []
+    assert data["total_items"] == 0
+    assert Book.search('').count() == 0
+
+def test_get_books_compressed(client, sample_books):
+    sample_books(20)
+
+    plain = client.get('/api/v1/books?per_page=20')
+    for _ in range(2):
+        response = client.get('/api/v1/books?per_page=20', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == plain.data
@@ -0,0 +1,16 @@
+import importlib.util
+from pathlib import Path
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / 'migrations' / 'versions'
+
+def load_migration(name):
+    spec = importlib.util.spec_from_file_location(name, MIGRATIONS / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_published_date_migration_nulls_values_the_cast_rejects():
+    migration = load_migration('book_published_date_to_date')
+    assert migration._is_date('2024-01-02')
+    for value in ['2023-02-30', '0000-00-00', '2024-W01-1', '20240101xx', '2024-1-2', 'unknown']:
+        assert not migration._is_date(value)